@@ -1,7 +1,7 @@
 import numpy as np
-import csv
 import multiprocessing as mp
-from utils import load_config
+from utils import (load_config, morton_order, open_trajectory, open_diagnostics, record_diagnostics,
+                   open_density_frames, density_map, write_density_frame)
 
 # ---------------- PARAMETERS ----------------
 config = load_config()
@@ -12,11 +12,22 @@ STEPS = config["STEPS"]
 N = config["N"]
 OUTPUT_FILE = config["OUTPUT_PY_PAR"]
 NUM_PROCESSES = config["NUM_PROCESSES"]
+REORDER_EVERY = config.get("REORDER_EVERY_PY", 0)
+DIAGNOSTICS_EVERY = config.get("DIAGNOSTICS_EVERY", 0)
+DIAGNOSTICS_FILE = config.get("DIAGNOSTICS_PY_PAR")
+ENERGY_DRIFT_MAX = config.get("ENERGY_DRIFT_MAX")
+WRITE_TRAJECTORY = config.get("WRITE_TRAJECTORY_PY", True)
+DENSITY_EVERY = config.get("DENSITY_EVERY_PY", 0)
+DENSITY_FILE = config.get("DENSITY_PY_PAR")
+DENSITY_AXES = config.get("DENSITY_AXES", "xy")
+DENSITY_RESOLUTION = config.get("DENSITY_RESOLUTION", [256, 256])
+DENSITY_EXTENT = config.get("DENSITY_EXTENT")
 
 # ---------------- FORCE WORKER ----------------
-def compute_chunk(start, end, positions, masses):
+def compute_chunk(start, end, positions, masses, with_potential=False):
     n = len(positions)
     forces_chunk = np.zeros((end - start, 3))
+    potential_chunk = 0.0
 
     for idx, i in enumerate(range(start, end)):
         for j in range(n):
@@ -29,7 +40,10 @@ def compute_chunk(start, end, positions, masses):
 
             forces_chunk[idx] += G * masses[i] * masses[j] * r * inv_dist3
 
-    return start, forces_chunk
+            if with_potential:
+                potential_chunk -= G * masses[i] * masses[j] / np.sqrt(dist_sqr)
+
+    return start, forces_chunk, potential_chunk
 
 
 # ---------------- SIMULATION ----------------
@@ -40,37 +54,74 @@ if __name__ == "__main__":
     positions = np.random.rand(N, 3)
     velocities = np.zeros((N, 3))
     masses = np.ones(N)
+    body_ids = np.arange(N)
 
     chunk_size = N // NUM_PROCESSES
 
+    if DIAGNOSTICS_EVERY:
+        diag_file, diag_writer = open_diagnostics(DIAGNOSTICS_FILE)
+    energy0 = None
+    if DENSITY_EVERY:
+        density_file = open_density_frames(DENSITY_FILE, DENSITY_RESOLUTION)
+
+    if WRITE_TRAJECTORY:
+        traj_file, writer = open_trajectory(OUTPUT_FILE)
+
     with mp.Pool(processes=NUM_PROCESSES) as pool:
-        with open(OUTPUT_FILE, "w", newline="") as f:
-            writer = csv.writer(f)
-            writer.writerow(["iteration", "body_id", "x", "y", "z"])
+        for step in range(STEPS):
+
+            # Morton reordering: each chunk gets spatially close bodies
+            if REORDER_EVERY and step % REORDER_EVERY == 0:
+                perm = morton_order(positions)
+                positions = positions[perm]
+                velocities = velocities[perm]
+                masses = masses[perm]
+                body_ids = body_ids[perm]
+
+            diag_step = DIAGNOSTICS_EVERY and step % DIAGNOSTICS_EVERY == 0
+
+            tasks = []
+            for p in range(NUM_PROCESSES):
+                start = p * chunk_size
+                end = (p + 1) * chunk_size if p != NUM_PROCESSES - 1 else N
+                tasks.append((start, end, positions, masses, diag_step))
 
-            for step in range(STEPS):
+            results = pool.starmap(compute_chunk, tasks)
 
-                tasks = []
-                for p in range(NUM_PROCESSES):
-                    start = p * chunk_size
-                    end = (p + 1) * chunk_size if p != NUM_PROCESSES - 1 else N
-                    tasks.append((start, end, positions, masses))
+            forces = np.zeros((N, 3))
+            potential = 0.0
+            for start, chunk_forces, chunk_potential in results:
+                forces[start:start + len(chunk_forces)] = chunk_forces
+                potential += chunk_potential
 
-                results = pool.starmap(compute_chunk, tasks)
+            # conservation diagnostics (each pair was counted twice)
+            if diag_step:
+                energy0 = record_diagnostics(diag_file, diag_writer, step, positions, velocities,
+                                             masses, 0.5 * potential, energy0, ENERGY_DRIFT_MAX)
 
-                forces = np.zeros((N, 3))
-                for start, chunk_forces in results:
-                    forces[start:start + len(chunk_forces)] = chunk_forces
+            accelerations = forces / masses[:, np.newaxis]
 
-                accelerations = forces / masses[:, np.newaxis]
+            velocities += accelerations * DT
+            positions += velocities * DT
 
-                velocities += accelerations * DT
-                positions += velocities * DT
+            if DENSITY_EVERY and step % DENSITY_EVERY == 0:
+                counts, extent = density_map(positions, DENSITY_AXES, DENSITY_RESOLUTION, DENSITY_EXTENT)
+                write_density_frame(density_file, step, counts, extent)
 
+            if WRITE_TRAJECTORY:
+                out = np.empty_like(positions)
+                out[body_ids] = positions
                 for i in range(N):
                     writer.writerow([step, i,
-                                     positions[i, 0],
-                                     positions[i, 1],
-                                     positions[i, 2]])
+                                     out[i, 0],
+                                     out[i, 1],
+                                     out[i, 2]])
+
+    if WRITE_TRAJECTORY:
+        traj_file.close()
+    if DIAGNOSTICS_EVERY:
+        diag_file.close()
+    if DENSITY_EVERY:
+        density_file.close()
 
     print("Parallel simulation finished.")
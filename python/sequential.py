@@ -1,6 +1,6 @@
 import numpy as np
-import csv
-from utils import load_config
+from utils import (load_config, morton_order, open_trajectory, open_diagnostics, record_diagnostics,
+                   open_density_frames, density_map, write_density_frame)
 
 # ---------------- PARAMETERS ----------------
 config = load_config()
@@ -10,6 +10,16 @@ DT = config["DT"]
 STEPS = config["STEPS"]
 N = config["N"]
 OUTPUT_FILE = config["OUTPUT_PY_SEQ"]
+REORDER_EVERY = config.get("REORDER_EVERY_PY", 0)
+DIAGNOSTICS_EVERY = config.get("DIAGNOSTICS_EVERY", 0)
+DIAGNOSTICS_FILE = config.get("DIAGNOSTICS_PY_SEQ")
+ENERGY_DRIFT_MAX = config.get("ENERGY_DRIFT_MAX")
+WRITE_TRAJECTORY = config.get("WRITE_TRAJECTORY_PY", True)
+DENSITY_EVERY = config.get("DENSITY_EVERY_PY", 0)
+DENSITY_FILE = config.get("DENSITY_PY_SEQ")
+DENSITY_AXES = config.get("DENSITY_AXES", "xy")
+DENSITY_RESOLUTION = config.get("DENSITY_RESOLUTION", [256, 256])
+DENSITY_EXTENT = config.get("DENSITY_EXTENT")
 
 # ---------------- INITIALIZATION ----------------
 np.random.seed(config["RANDOM_SEED"])
@@ -17,11 +27,13 @@ np.random.seed(config["RANDOM_SEED"])
 positions = np.random.rand(N, 3)
 velocities = np.zeros((N, 3))
 masses = np.ones(N)
+body_ids = np.arange(N)
 
 # ---------------- FORCE COMPUTATION ----------------
-def compute_forces(pos, masses):
+def compute_forces(pos, masses, with_potential=False):
     n = len(pos)
     forces = np.zeros((n, 3))
+    potential = 0.0
 
     for i in range(n):
         for j in range(n):
@@ -34,29 +46,67 @@ def compute_forces(pos, masses):
 
             forces[i] += G * masses[i] * masses[j] * r * inv_dist3
 
-    return forces
+            if with_potential:
+                potential -= G * masses[i] * masses[j] / np.sqrt(dist_sqr)
+
+    # each pair was visited twice
+    return forces, 0.5 * potential
 
 # ---------------- SIMULATION ----------------
-with open(OUTPUT_FILE, "w", newline="") as f:
-    writer = csv.writer(f)
-    writer.writerow(["iteration", "body_id", "x", "y", "z"])
+if DIAGNOSTICS_EVERY:
+    diag_file, diag_writer = open_diagnostics(DIAGNOSTICS_FILE)
+energy0 = None
+if DENSITY_EVERY:
+    density_file = open_density_frames(DENSITY_FILE, DENSITY_RESOLUTION)
+
+if WRITE_TRAJECTORY:
+    traj_file, writer = open_trajectory(OUTPUT_FILE)
+
+for step in range(STEPS):
 
-    for step in range(STEPS):
+    # Morton reordering (body_ids keeps the original order)
+    if REORDER_EVERY and step % REORDER_EVERY == 0:
+        perm = morton_order(positions)
+        positions = positions[perm]
+        velocities = velocities[perm]
+        masses = masses[perm]
+        body_ids = body_ids[perm]
 
-        forces = compute_forces(positions, masses)
+    diag_step = DIAGNOSTICS_EVERY and step % DIAGNOSTICS_EVERY == 0
+    forces, potential = compute_forces(positions, masses, with_potential=diag_step)
 
-        # acceleration
-        accelerations = forces / masses[:, np.newaxis]
+    # conservation diagnostics for the state at the start of the step
+    if diag_step:
+        energy0 = record_diagnostics(diag_file, diag_writer, step, positions, velocities,
+                                     masses, potential, energy0, ENERGY_DRIFT_MAX)
 
-        # Euler integration
-        velocities += accelerations * DT
-        positions += velocities * DT
+    # acceleration
+    accelerations = forces / masses[:, np.newaxis]
 
-        # write CSV
+    # Euler integration
+    velocities += accelerations * DT
+    positions += velocities * DT
+
+    # in-situ density map
+    if DENSITY_EVERY and step % DENSITY_EVERY == 0:
+        counts, extent = density_map(positions, DENSITY_AXES, DENSITY_RESOLUTION, DENSITY_EXTENT)
+        write_density_frame(density_file, step, counts, extent)
+
+    # write CSV (by original body_id)
+    if WRITE_TRAJECTORY:
+        out = np.empty_like(positions)
+        out[body_ids] = positions
         for i in range(N):
             writer.writerow([step, i,
-                             positions[i, 0],
-                             positions[i, 1],
-                             positions[i, 2]])
+                             out[i, 0],
+                             out[i, 1],
+                             out[i, 2]])
+
+if WRITE_TRAJECTORY:
+    traj_file.close()
+if DIAGNOSTICS_EVERY:
+    diag_file.close()
+if DENSITY_EVERY:
+    density_file.close()
 
 print("Sequential simulation finished.")
@@ -1,5 +1,9 @@
+import csv
 import json
 import os
+import struct
+import sys
+import numpy as np
 
 def load_config(config_path="../config/config.json"):
     """Load configuration from JSON file."""
@@ -13,5 +17,156 @@ def load_config(config_path="../config/config.json"):
     # If NUM_PROCESSES is null, use CPU count
     if config.get("NUM_PROCESSES") is None:
         config["NUM_PROCESSES"] = os.cpu_count()
+
+    # The drift check runs only on diagnostics steps
+    if config.get("ENERGY_DRIFT_MAX") is not None and not config.get("DIAGNOSTICS_EVERY"):
+        raise ValueError("ENERGY_DRIFT_MAX is set but DIAGNOSTICS_EVERY is 0; "
+                         "enable diagnostics or unset ENERGY_DRIFT_MAX")
+
+    axes = config.get("DENSITY_AXES", "xy")
+    if not isinstance(axes, str) or len(axes) != 2 or axes[0] == axes[1] or not set(axes) <= set("xyz"):
+        raise ValueError(f"DENSITY_AXES must be two distinct letters from 'xyz', got {axes!r}")
+    resolution = config.get("DENSITY_RESOLUTION", [256, 256])
+    if (not isinstance(resolution, list) or len(resolution) != 2
+            or not all(isinstance(r, int) and not isinstance(r, bool) and r > 0 for r in resolution)):
+        raise ValueError(f"DENSITY_RESOLUTION must be two positive integers, got {resolution!r}")
     
     return config
+
+
+def _spread_bits(v):
+    """Spread the low 21 bits so that two zero bits separate each pair."""
+    v = v & np.uint64(0x1FFFFF)
+    v = (v | (v << np.uint64(32))) & np.uint64(0x1F00000000FFFF)
+    v = (v | (v << np.uint64(16))) & np.uint64(0x1F0000FF0000FF)
+    v = (v | (v << np.uint64(8))) & np.uint64(0x100F00F00F00F00F)
+    v = (v | (v << np.uint64(4))) & np.uint64(0x10C30C30C30C30C3)
+    v = (v | (v << np.uint64(2))) & np.uint64(0x1249249249249249)
+    return v
+
+
+def morton_keys(positions, bits=21):
+    """3D Morton (Z-order) keys: quantize coordinates to `bits` bits and interleave them."""
+    lo = positions.min(axis=0)
+    span = positions.max(axis=0) - lo
+    span[span == 0] = 1.0
+    scale = (1 << bits) - 1
+    q = ((positions - lo) / span * scale).astype(np.uint64)
+    return (_spread_bits(q[:, 0])
+            | (_spread_bits(q[:, 1]) << np.uint64(1))
+            | (_spread_bits(q[:, 2]) << np.uint64(2)))
+
+
+def morton_order(positions):
+    """Permutation sorting bodies by Morton key (spatially close bodies become adjacent in memory)."""
+    return np.argsort(morton_keys(positions), kind="stable")
+
+
+DIAGNOSTICS_HEADER = ["iteration", "kinetic", "potential", "total", "drift",
+                      "px", "py", "pz", "lx", "ly", "lz", "cx", "cy", "cz"]
+
+
+def open_trajectory(path):
+    """Open the trajectory CSV and write its header; returns (file, writer)."""
+    f = open(path, "w", newline="")
+    writer = csv.writer(f)
+    writer.writerow(["iteration", "body_id", "x", "y", "z"])
+    return f, writer
+
+
+def open_diagnostics(path):
+    """Open the diagnostics CSV and write its header; returns (file, writer)."""
+    f = open(path, "w", newline="")
+    writer = csv.writer(f)
+    writer.writerow(DIAGNOSTICS_HEADER)
+    return f, writer
+
+
+def conservation_diagnostics(positions, velocities, masses, potential):
+    """O(N) reductions of conserved quantities; `potential` comes from the force pass."""
+    m = masses[:, np.newaxis]
+    kinetic = 0.5 * np.sum(masses * np.einsum("ij,ij->i", velocities, velocities))
+    return {
+        "kinetic": kinetic,
+        "potential": potential,
+        "total": kinetic + potential,
+        "momentum": (m * velocities).sum(axis=0),
+        "angular_momentum": np.cross(positions, m * velocities).sum(axis=0),
+        "center_of_mass": (m * positions).sum(axis=0) / masses.sum(),
+    }
+
+
+def energy_drift(total, total0):
+    """Relative energy drift |E - E0| / |E0| (absolute if E0 == 0)."""
+    if total0 == 0:
+        return abs(total - total0)
+    return abs(total - total0) / abs(total0)
+
+
+def diagnostics_row(step, diag, drift):
+    return [step, diag["kinetic"], diag["potential"], diag["total"], drift,
+            *diag["momentum"], *diag["angular_momentum"], *diag["center_of_mass"]]
+
+
+def record_diagnostics(diag_file, writer, step, positions, velocities, masses,
+                       potential, energy0, drift_max):
+    """Log diagnostics for one step and return E0 (taken from the first call).
+
+    Aborts the run (exit code 1) when the energy drift is NaN/inf or exceeds `drift_max`.
+    """
+    diag = conservation_diagnostics(positions, velocities, masses, potential)
+    if energy0 is None:
+        energy0 = diag["total"]
+    drift = energy_drift(diag["total"], energy0)
+    writer.writerow(diagnostics_row(step, diag, drift))
+    if drift_max is not None and (not np.isfinite(drift) or drift > drift_max):
+        diag_file.close()
+        print(f"Energy drift {drift:.3e} at step {step} is non-finite or exceeds "
+              f"ENERGY_DRIFT_MAX={drift_max}, aborting.", file=sys.stderr)
+        sys.exit(1)
+    return energy0
+
+
+# Density frame file (little-endian): header "NBDM", version, width, height (u32),
+# then per frame: iteration (u32), x_min, x_max, y_min, y_max (f64),
+# height * width counts (u32, row-major, row 0 at y_min).
+DENSITY_MAGIC = b"NBDM"
+DENSITY_VERSION = 1
+AXIS_INDEX = {"x": 0, "y": 1, "z": 2}
+
+
+def open_density_frames(path, resolution):
+    """Open the density frame file and write its header."""
+    width, height = resolution
+    f = open(path, "wb")
+    f.write(struct.pack("<4sIII", DENSITY_MAGIC, DENSITY_VERSION, width, height))
+    return f
+
+
+def density_map(positions, axes, resolution, extent=None):
+    """Project positions onto two axes (e.g. "xy") and bin them into a 2D histogram.
+
+    Without a fixed `extent` ([[min, max], [min, max]]) the frame's own bounds are used.
+    Bodies with a non-finite coordinate are left out of the map.
+    Returns (counts of shape (height, width), extent).
+    """
+    a = positions[:, AXIS_INDEX[axes[0]]]
+    b = positions[:, AXIS_INDEX[axes[1]]]
+    finite = np.isfinite(a) & np.isfinite(b)
+    a, b = a[finite], b[finite]
+    if extent is None:
+        if len(a) == 0:
+            extent = [[-1.0, 1.0], [-1.0, 1.0]]
+        else:
+            extent = [[a.min(), a.max()], [b.min(), b.max()]]
+        for lim in extent:
+            if lim[1] - lim[0] < 1e-12:
+                lim[0] -= 1.0
+                lim[1] += 1.0
+    counts, _, _ = np.histogram2d(a, b, bins=resolution, range=extent)
+    return counts.T.astype(np.uint32), extent
+
+
+def write_density_frame(f, step, counts, extent):
+    f.write(struct.pack("<I4d", step, extent[0][0], extent[0][1], extent[1][0], extent[1][1]))
+    f.write(counts.astype("<u4").tobytes())
@@ -2,7 +2,8 @@ use rayon::prelude::*;
 use std::fs::File;
 use std::io::{BufWriter, Write};
 use std::path::PathBuf;
-use rand::Rng;
+use rand::rngs::StdRng;
+use rand::{Rng, SeedableRng};
 use serde::Deserialize;
 
 #[derive(Debug, Deserialize)]
@@ -19,6 +20,14 @@ struct Config {
     n: usize,
     #[serde(rename = "OUTPUT_RS_PAR")]
     output_file: String,
+    #[serde(rename = "RANDOM_SEED")]
+    random_seed: u64,
+    #[serde(rename = "DIAGNOSTICS_EVERY", default)]
+    diagnostics_every: usize,
+    #[serde(rename = "DIAGNOSTICS_RS_PAR", default)]
+    diagnostics_file: Option<String>,
+    #[serde(rename = "ENERGY_DRIFT_MAX", default)]
+    energy_drift_max: Option<f64>,
 }
 
 fn load_config() -> Config {
@@ -39,13 +48,14 @@ struct Body {
     mass: f64,
 }
 
-fn compute_forces_parallel(bodies: &Vec<Body>, g: f64, eps: f64) -> Vec<[f64; 3]> {
+fn compute_forces_parallel(bodies: &Vec<Body>, g: f64, eps: f64, with_potential: bool) -> (Vec<[f64; 3]>, f64) {
     let n = bodies.len();
 
-    (0..n)
+    let results: Vec<([f64; 3], f64)> = (0..n)
         .into_par_iter()
         .map(|i| {
             let mut force = [0.0; 3];
+            let mut pot = 0.0;
 
             for j in 0..n {
                 if i == j {
@@ -64,17 +74,77 @@ fn compute_forces_parallel(bodies: &Vec<Body>, g: f64, eps: f64) -> Vec<[f64; 3]
                 force[0] += f * dx;
                 force[1] += f * dy;
                 force[2] += f * dz;
+
+                if with_potential {
+                    pot -= g * bodies[i].mass * bodies[j].mass / dist_sqr.sqrt();
+                }
             }
 
-            force
+            (force, pot)
         })
-        .collect()
+        .collect();
+
+    let forces = results.iter().map(|(f, _)| *f).collect();
+    // svaki par je obiđen dva puta
+    let potential = 0.5 * results.iter().map(|(_, p)| p).sum::<f64>();
+    (forces, potential)
+}
+
+struct Diagnostics {
+    kinetic: f64,
+    potential: f64,
+    momentum: [f64; 3],
+    angular_momentum: [f64; 3],
+    center_of_mass: [f64; 3],
+}
+
+// O(N) redukcije očuvanih veličina; potencijalna energija dolazi iz prolaza sila
+fn conservation_diagnostics(bodies: &Vec<Body>, potential: f64) -> Diagnostics {
+    let mut d = Diagnostics {
+        kinetic: 0.0,
+        potential,
+        momentum: [0.0; 3],
+        angular_momentum: [0.0; 3],
+        center_of_mass: [0.0; 3],
+    };
+    let mut total_mass = 0.0;
+
+    for b in bodies {
+        let [x, y, z] = b.pos;
+        let [px, py, pz] = [b.mass * b.vel[0], b.mass * b.vel[1], b.mass * b.vel[2]];
+
+        d.kinetic += 0.5 * b.mass * (b.vel[0] * b.vel[0] + b.vel[1] * b.vel[1] + b.vel[2] * b.vel[2]);
+        d.momentum[0] += px;
+        d.momentum[1] += py;
+        d.momentum[2] += pz;
+        d.angular_momentum[0] += y * pz - z * py;
+        d.angular_momentum[1] += z * px - x * pz;
+        d.angular_momentum[2] += x * py - y * px;
+        d.center_of_mass[0] += b.mass * x;
+        d.center_of_mass[1] += b.mass * y;
+        d.center_of_mass[2] += b.mass * z;
+        total_mass += b.mass;
+    }
+    for c in d.center_of_mass.iter_mut() {
+        *c /= total_mass;
+    }
+
+    d
+}
+
+// relativni drift energije |E - E0| / |E0| (apsolutni ako je E0 == 0)
+fn energy_drift(total: f64, total0: f64) -> f64 {
+    if total0 == 0.0 {
+        (total - total0).abs()
+    } else {
+        (total - total0).abs() / total0.abs()
+    }
 }
 
 fn main() {
     let config = load_config();
 
-    let mut rng = rand::thread_rng();
+    let mut rng = StdRng::seed_from_u64(config.random_seed);
     let mut bodies: Vec<Body> = (0..config.n)
         .map(|_| Body {
             pos: [
@@ -87,13 +157,57 @@ fn main() {
         })
         .collect();
 
+    if config.energy_drift_max.is_some() && config.diagnostics_every == 0 {
+        eprintln!("ENERGY_DRIFT_MAX is set but DIAGNOSTICS_EVERY is 0; enable diagnostics or unset ENERGY_DRIFT_MAX");
+        std::process::exit(1);
+    }
+
     let file = File::create(&config.output_file).unwrap();
     let mut writer = BufWriter::new(file);
 
     writeln!(writer, "iteration,body_id,x,y,z").unwrap();
 
+    let mut diag_writer = if config.diagnostics_every > 0 {
+        let path = config.diagnostics_file.as_ref().expect("DIAGNOSTICS_RS_PAR is not set");
+        let mut w = BufWriter::new(File::create(path).unwrap());
+        writeln!(w, "iteration,kinetic,potential,total,drift,px,py,pz,lx,ly,lz,cx,cy,cz").unwrap();
+        Some(w)
+    } else {
+        None
+    };
+    let mut energy0: Option<f64> = None;
+
     for step in 0..config.steps {
-        let forces = compute_forces_parallel(&bodies, config.g, config.eps);
+        let diag_step = config.diagnostics_every > 0 && step % config.diagnostics_every == 0;
+        let (forces, potential) = compute_forces_parallel(&bodies, config.g, config.eps, diag_step);
+
+        if let (true, Some(w)) = (diag_step, diag_writer.as_mut()) {
+            let d = conservation_diagnostics(&bodies, potential);
+            let total = d.kinetic + d.potential;
+            let e0 = *energy0.get_or_insert(total);
+            let drift = energy_drift(total, e0);
+            writeln!(
+                w,
+                "{},{},{},{},{},{},{},{},{},{},{},{},{},{}",
+                step, d.kinetic, d.potential, total, drift,
+                d.momentum[0], d.momentum[1], d.momentum[2],
+                d.angular_momentum[0], d.angular_momentum[1], d.angular_momentum[2],
+                d.center_of_mass[0], d.center_of_mass[1], d.center_of_mass[2]
+            )
+            .unwrap();
+
+            if let Some(max) = config.energy_drift_max {
+                if !drift.is_finite() || drift > max {
+                    w.flush().unwrap();
+                    writer.flush().unwrap();
+                    eprintln!(
+                        "Energy drift {:.3e} at step {} is non-finite or exceeds ENERGY_DRIFT_MAX={}, aborting.",
+                        drift, step, max
+                    );
+                    std::process::exit(1);
+                }
+            }
+        }
 
         for i in 0..config.n {
             let ax = forces[i][0] / bodies[i].mass;
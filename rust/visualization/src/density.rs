@@ -0,0 +1,131 @@
+// Density frejmovi koje piše python/utils.py (little-endian):
+// header "NBDM", version, width, height (u32), zatim po frejmu:
+// iteration (u32), x_min, x_max, y_min, y_max (f64), height*width brojeva (u32, red 0 = y_min).
+//
+// Modul koristi samo std: svaki frejm se upisuje kao PPM slika (ffmpeg ih čita
+// kao i PNG frejmove, npr. `ffmpeg -i <prefix>_%05d.ppm out.gif`).
+
+use std::error::Error;
+use std::fs::{self, File};
+use std::io::{BufWriter, Write};
+
+const MAGIC: &[u8; 4] = b"NBDM";
+const VERSION: u32 = 1;
+const TARGET_SIZE: usize = 512;
+
+pub struct Frame {
+    pub iteration: u32,
+    pub extent: [f64; 4],
+    pub counts: Vec<u32>,
+}
+
+pub struct DensityFrames {
+    pub width: usize,
+    pub height: usize,
+    pub frames: Vec<Frame>,
+}
+
+fn read_u32(buf: &[u8], off: &mut usize) -> u32 {
+    let v = u32::from_le_bytes(buf[*off..*off + 4].try_into().unwrap());
+    *off += 4;
+    v
+}
+
+fn read_f64(buf: &[u8], off: &mut usize) -> f64 {
+    let v = f64::from_le_bytes(buf[*off..*off + 8].try_into().unwrap());
+    *off += 8;
+    v
+}
+
+pub fn parse(buf: &[u8]) -> Result<DensityFrames, Box<dyn Error>> {
+    if buf.len() < 4 || &buf[0..4] != MAGIC {
+        return Err("not a density frame file (bad magic)".into());
+    }
+    if buf.len() < 16 {
+        return Err("truncated density frame header".into());
+    }
+
+    let mut off = 4;
+    let version = read_u32(buf, &mut off);
+    if version != VERSION {
+        return Err(format!("unsupported density frame version {} (expected {})", version, VERSION).into());
+    }
+    let width = read_u32(buf, &mut off) as usize;
+    let height = read_u32(buf, &mut off) as usize;
+    if width == 0 || height == 0 {
+        return Err(format!("invalid density resolution {}x{}", width, height).into());
+    }
+
+    let frame_size = 4 + 4 * 8 + 4 * width * height;
+    if (buf.len() - off) % frame_size != 0 {
+        return Err("truncated density frame file".into());
+    }
+
+    let mut frames = Vec::new();
+    while off < buf.len() {
+        let iteration = read_u32(buf, &mut off);
+        let extent = [
+            read_f64(buf, &mut off),
+            read_f64(buf, &mut off),
+            read_f64(buf, &mut off),
+            read_f64(buf, &mut off),
+        ];
+        let counts = (0..width * height).map(|_| read_u32(buf, &mut off)).collect();
+        frames.push(Frame { iteration, extent, counts });
+    }
+
+    Ok(DensityFrames { width, height, frames })
+}
+
+// logaritamska skala: belo (prazno), plavo (retko) -> crveno (gusto)
+fn color(count: u32, max_count: u32) -> [u8; 3] {
+    if count == 0 {
+        return [255, 255, 255];
+    }
+    let t = (count as f64).ln_1p() / (max_count.max(1) as f64).ln_1p();
+    [(255.0 * t) as u8, 0, (255.0 * (1.0 - t)) as u8]
+}
+
+fn write_ppm(path: &str, data: &DensityFrames, frame: &Frame) -> Result<(), Box<dyn Error>> {
+    let scale = (TARGET_SIZE / data.width.max(data.height)).max(1);
+    let (w, h) = (data.width * scale, data.height * scale);
+    let max_count = frame.counts.iter().copied().max().unwrap_or(0);
+
+    let mut out = BufWriter::new(File::create(path)?);
+    let [x0, x1, y0, y1] = frame.extent;
+    // opseg osa ide u komentar PPM zaglavlja
+    write!(
+        out,
+        "P6\n# iteration {} x [{}, {}] y [{}, {}]\n{} {}\n255\n",
+        frame.iteration, x0, x1, y0, y1, w, h
+    )?;
+    // slika ide odozgo nadole, a red 0 u mapi je y_min
+    for py in 0..h {
+        let row = data.height - 1 - py / scale;
+        for px in 0..w {
+            let col = px / scale;
+            out.write_all(&color(frame.counts[row * data.width + col], max_count))?;
+        }
+    }
+    out.flush()?;
+    Ok(())
+}
+
+pub fn render(input_path: &str, prefix: &str) -> Result<(), Box<dyn Error>> {
+    let buf = fs::read(input_path)?;
+    let data = parse(&buf).map_err(|e| format!("{}: {}", input_path, e))?;
+
+    for frame in &data.frames {
+        let filename = format!("{}_{:05}.ppm", prefix, frame.iteration);
+        write_ppm(&filename, &data, frame)?;
+    }
+
+    println!(
+        "{} density frames ({}x{}) written with prefix {}",
+        data.frames.len(),
+        data.width,
+        data.height,
+        prefix
+    );
+    Ok(())
+}
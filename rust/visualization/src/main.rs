@@ -8,6 +8,8 @@ use csv::ReaderBuilder;
 use plotters::prelude::*;
 use serde::Deserialize;
 
+mod density;
+
 #[derive(Debug, Deserialize)]
 struct Record {
     iteration: u32,
@@ -229,6 +231,7 @@ fn run() -> Result<(), Box<dyn Error>> {
         eprintln!("Usage:");
         eprintln!("  visualization <input.csv> trajectories <output.svg>");
         eprintln!("  visualization <input.csv> frames <output_prefix> [step]");
+        eprintln!("  visualization <frames.bin> density <output_prefix>");
         eprintln!("  or: visualization <csv_base_name>   # auto GIF in animations/");
         std::process::exit(1);
     }
@@ -236,6 +239,12 @@ fn run() -> Result<(), Box<dyn Error>> {
     let input_path = &args[1];
     let mode = &args[2];
 
+    // density frejmovi iz simulacije (bez CSV trajektorija)
+    if mode.as_str() == "density" {
+        let prefix: &str = if args.len() >= 4 { &args[3] } else { "density" };
+        return density::render(input_path, prefix);
+    }
+
     let file = File::open(input_path)?;
     let mut reader = ReaderBuilder::new()
         .has_headers(true)
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Efekat Morton (Z-order) preuređivanja tela na lokalnost keša.
+
+Za svako N tela se generišu nasumično (kao u simulaciji), pa se meri isti
+kernel nad mrežom ćelija (zbir pozicija po ćeliji, tipičan pristup u grid/tree
+kernelima) nad originalnim i nad Morton redosledom. Redosled ćelija se računa
+van merenja, pa se meri samo memorijski deo: gather `positions[idx]` i
+redukcija po ćeliji. U originalnom redosledu tela iz iste ćelije su razbacana
+po memoriji, pa je gather nasumičan; posle preuređivanja je skoro sekvencijalan.
+Meri se i cena samog preuređivanja i prostorna kompaktnost chunk-ova koje
+dobijaju procesi u parallel.py (srednja zapremina bounding box-a).
+
+Pokretanje iz korena: python scripts/morton_benchmark.py [--n 100000 1000000 ...]
+Izlaz: scripts/results/morton_benchmark.csv
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+sys.path.insert(0, str(PROJECT_ROOT / "python"))
+from utils import load_config, morton_order  # noqa: E402
+
+
+def best_time(fn, repeats):
+    best = float("inf")
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def cell_order(positions, cells_per_axis):
+    """Indeksi tela grupisani po ćeliji mreže i početak svake ćelije (van merenja)."""
+    q = np.minimum((positions * cells_per_axis).astype(np.int64), cells_per_axis - 1)
+    cell = (q[:, 0] * cells_per_axis + q[:, 1]) * cells_per_axis + q[:, 2]
+    idx = np.argsort(cell, kind="stable")
+    starts = np.flatnonzero(np.diff(cell[idx], prepend=-1))
+    return idx, starts
+
+
+def cell_kernel(positions, idx, starts):
+    """Zbir pozicija po ćeliji mreže; pristup telima ide redosledom ćelija."""
+    return np.add.reduceat(positions[idx], starts, axis=0)
+
+
+def mean_chunk_volume(positions, num_chunks):
+    """Srednja zapremina bounding box-a chunk-ova kao u parallel.py."""
+    n = len(positions)
+    size = n // num_chunks
+    vols = []
+    for p in range(num_chunks):
+        end = (p + 1) * size if p != num_chunks - 1 else n
+        chunk = positions[p * size:end]
+        vols.append(np.prod(chunk.max(axis=0) - chunk.min(axis=0)))
+    return float(np.mean(vols))
+
+
+def main():
+    config = load_config()
+    parser = argparse.ArgumentParser(description="Benchmark Morton preuređivanja")
+    parser.add_argument("--n", type=int, nargs="+", default=[10_000, 100_000, 1_000_000, 4_000_000], help="Broj tela")
+    parser.add_argument("--bodies-per-cell", type=int, default=8, help="Prosečan broj tela po ćeliji mreže")
+    parser.add_argument("--repeats", type=int, default=5, help="Broj ponavljanja (uzima se najbolje vreme)")
+    parser.add_argument("--chunks", type=int, default=config.get("NUM_PROCESSES") or 2, help="Broj chunk-ova (procesa)")
+    args = parser.parse_args()
+
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    np.random.seed(config["RANDOM_SEED"])
+
+    rows = []
+    print(f"\n  Morton benchmark: N={args.n}, chunks={args.chunks}\n")
+    for n in args.n:
+        positions = np.random.rand(n, 3)
+        cells = max(1, round((n / args.bodies_per_cell) ** (1 / 3)))
+
+        t_reorder = best_time(lambda: morton_order(positions), args.repeats)
+        ordered = positions[morton_order(positions)]
+
+        idx_random, starts_random = cell_order(positions, cells)
+        idx_morton, starts_morton = cell_order(ordered, cells)
+        t_random = best_time(lambda: cell_kernel(positions, idx_random, starts_random), args.repeats)
+        t_morton = best_time(lambda: cell_kernel(ordered, idx_morton, starts_morton), args.repeats)
+
+        rows.append({
+            "N": n, "cells_per_axis": cells,
+            "kernel_random_sec": round(t_random, 6), "kernel_morton_sec": round(t_morton, 6),
+            "speedup": round(t_random / t_morton, 3), "reorder_sec": round(t_reorder, 6),
+            "chunk_volume_random": round(mean_chunk_volume(positions, args.chunks), 6),
+            "chunk_volume_morton": round(mean_chunk_volume(ordered, args.chunks), 6),
+        })
+        r = rows[-1]
+        print(f"  N={n:>9}: kernel {r['kernel_random_sec']:.4f}s -> {r['kernel_morton_sec']:.4f}s "
+              f"(x{r['speedup']}), reorder {r['reorder_sec']:.4f}s, "
+              f"chunk volume {r['chunk_volume_random']:.3f} -> {r['chunk_volume_morton']:.3f}")
+
+    out_csv = RESULTS_DIR / "morton_benchmark.csv"
+    with open(out_csv, "w", encoding="utf-8", newline="") as f:
+        keys = list(rows[0].keys())
+        f.write(",".join(keys) + "\n")
+        for r in rows:
+            f.write(",".join(str(r[k]) for k in keys) + "\n")
+
+    print(f"\n  Results: {out_csv}\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,10 @@ Eksperiment 6.1 - Jako skaliranje (Strong Scaling).
 Fiksan N, menja se broj jezgara P. Svaka kombinacija se izvršava NUM_RUNS puta
 (config, podrazumevano 30) radi srednje vrednosti, std i outliera.
 
+Posle svakog P paralelni izlazi se porede sa sekvencijalnim (verify_outputs.py);
+rezultat (True/False/skipped) se upisuje u kolonu `verified`. Provera se
+preskače ako neko pokretanje u seriji nije uspelo (izlaz bi mogao biti zastareo).
+
 Pokretanje iz korena: python scripts/strong_scaling.py
 Izlaz: scripts/results/strong_scaling.csv, strong_scaling_raw.csv
 """
@@ -16,6 +20,8 @@ import sys
 import time
 from pathlib import Path
 
+from verify_outputs import default_outputs, verify_pairs
+
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
 CONFIG_PATH = PROJECT_ROOT / "config" / "config.json"
 RESULTS_DIR = Path(__file__).resolve().parent / "results"
@@ -85,8 +91,17 @@ def main():
 
     all_raw = []
     summary_rows = []
+    outputs = default_outputs(config)
+
+    def verify(lang, times):
+        """Poredi seq i par izlaz za dati jezik: True, False ili "skipped"."""
+        if len(times) != num_runs:
+            print(f"  {lang}: verification skipped ({len(times)}/{num_runs} runs succeeded)")
+            return "skipped"
+        seq, par = f"seq_{lang}", f"par_{lang}"
+        return verify_pairs([(seq, outputs[seq], par, outputs[par])])
 
-    def add_summary(lang, ver, P, times):
+    def add_summary(lang, ver, P, times, verified=""):
         if not times:
             return
         mean_t, std_t, min_t, max_t, out_t = stats(times)
@@ -94,7 +109,7 @@ def main():
             "language": lang, "version": ver, "P": P, "N": N, "STEPS": STEPS,
             "mean_sec": round(mean_t, 4), "std_sec": round(std_t, 4),
             "min_sec": round(min_t, 4), "max_sec": round(max_t, 4),
-            "num_runs": len(times), "outlier_count": out_t,
+            "num_runs": len(times), "outlier_count": out_t, "verified": verified,
         })
         for run_idx, t in enumerate(times, 1):
             all_raw.append({"language": lang, "version": ver, "P": P, "N": N, "STEPS": STEPS, "run": run_idx, "time_sec": round(t, 4)})
@@ -145,7 +160,7 @@ def main():
                 break
             py_par_times.append(t)
             progress_bar(i + 1, num_runs, label=f"Python par P={P}", time_sec=t)
-        add_summary("python", "par", P, py_par_times)
+        add_summary("python", "par", P, py_par_times, verify("python", py_par_times))
         print("  │     ✓ Python par done")
 
         env = os.environ.copy()
@@ -158,7 +173,7 @@ def main():
                 break
             rs_par_times.append(t)
             progress_bar(i + 1, num_runs, label=f"Rust par P={P}", time_sec=t)
-        add_summary("rust", "par", P, rs_par_times)
+        add_summary("rust", "par", P, rs_par_times, verify("rust", rs_par_times))
         print("  │     ✓ Rust par done")
 
     print("  └─────────────────────────────────────────────────────────")
@@ -171,9 +186,9 @@ def main():
 
     out_csv = RESULTS_DIR / "strong_scaling.csv"
     with open(out_csv, "w", encoding="utf-8", newline="") as f:
-        f.write("language,version,P,N,STEPS,mean_sec,std_sec,min_sec,max_sec,num_runs,outlier_count\n")
+        f.write("language,version,P,N,STEPS,mean_sec,std_sec,min_sec,max_sec,num_runs,outlier_count,verified\n")
         for r in summary_rows:
-            f.write(f"{r['language']},{r['version']},{r['P']},{r['N']},{r['STEPS']},{r['mean_sec']},{r['std_sec']},{r['min_sec']},{r['max_sec']},{r['num_runs']},{r['outlier_count']}\n")
+            f.write(f"{r['language']},{r['version']},{r['P']},{r['N']},{r['STEPS']},{r['mean_sec']},{r['std_sec']},{r['min_sec']},{r['max_sec']},{r['num_runs']},{r['outlier_count']},{r['verified']}\n")
 
     print(f"\n  Summary: {out_csv}")
     print(f"  Raw:    {raw_path}\n")
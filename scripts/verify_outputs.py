@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+Provera saglasnosti izlaza simulacija (seq/par, Python/Rust).
+
+Dva CSV fajla formata `iteration,body_id,x,y,z` čitaju se paralelno, u blokovima
+od najviše `--chunk-rows` redova, i porede vektorizovano sa relativnom i
+apsolutnom tolerancijom (|a - b| <= atol + rtol * |b|; NaN uvek odstupa). Svaki
+fajl se jednom skenira da bi se odredili bajt-ofseti granica blokova i broj
+linija, pa se blokovi raspodeljuju na procese; ceo fajl se nikada ne učitava
+u memoriju.
+
+Pokretanje iz korena:
+    python scripts/verify_outputs.py                  # podrazumevani parovi
+    python scripts/verify_outputs.py a.csv b.csv      # proizvoljan par
+Izlazni kod je 1 ako se bilo koji par razlikuje.
+
+Napomena: Python i Rust koriste različite generatore slučajnih brojeva, pa se
+početne pozicije razlikuju između jezika; podrazumevano se porede verzije istog
+jezika (seq_python/par_python i seq_rust/par_rust).
+"""
+
+import argparse
+import io
+import json
+import multiprocessing as mp
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+CONFIG_PATH = PROJECT_ROOT / "config" / "config.json"
+
+NUM_COLUMNS = 5  # iteration, body_id, x, y, z
+SCAN_BLOCK = 1 << 24
+DEFAULT_CHUNK_ROWS = 200_000  # ~12 MB teksta po fajlu i bloku
+
+
+def load_config():
+    with open(CONFIG_PATH, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def default_outputs(config):
+    """Putanje izlaza iz config-a; Rust putanje su relativne na rust/<verzija>.
+
+    Ako je WRITE_TRAJECTORY_PY isključen, Python putanje su None (stari CSV fajlovi
+    bi bili zastareli), pa se ti parovi preskaču.
+    """
+    write_py = config.get("WRITE_TRAJECTORY_PY", True)
+    return {
+        "seq_python": (PROJECT_ROOT / config["OUTPUT_PY_SEQ"]).resolve() if write_py else None,
+        "par_python": (PROJECT_ROOT / config["OUTPUT_PY_PAR"]).resolve() if write_py else None,
+        "seq_rust": (PROJECT_ROOT / "rust" / "sequential" / config["OUTPUT_RS_SEQ"]).resolve(),
+        "par_rust": (PROJECT_ROOT / "rust" / "parallel" / config["OUTPUT_RS_PAR"]).resolve(),
+    }
+
+
+def bodies_per_step(path):
+    """Broj tela N: broj redova sa istom (prvom) iteracijom."""
+    with open(path, "rb") as f:
+        f.readline()  # header
+        first = None
+        n = 0
+        for line in f:
+            it = line.split(b",", 1)[0]
+            if first is None:
+                first = it
+            elif it != first:
+                break
+            n += 1
+    return n
+
+
+def scan_offsets(task):
+    """Jedan prolaz kroz fajl: ofseti početaka linija 1, 1 + stride, 1 + 2*stride, ...
+
+    Vraća (ofseti, broj linija, veličina fajla); linija 0 je header.
+    """
+    path, stride = task
+    offsets = []
+    next_line = 1
+    seen = 0  # broj pročitanih '\n'
+    pos = 0
+    last = b"\n"
+    with open(path, "rb") as f:
+        while True:
+            block = f.read(SCAN_BLOCK)
+            if not block:
+                break
+            newlines = np.flatnonzero(np.frombuffer(block, dtype=np.uint8) == ord("\n"))
+            while next_line <= seen + len(newlines):
+                offsets.append(pos + int(newlines[next_line - seen - 1]) + 1)
+                next_line += stride
+            seen += len(newlines)
+            pos += len(block)
+            last = block[-1:]
+    lines = seen + (1 if pos and last != b"\n" else 0)
+    return offsets, lines, pos
+
+
+def read_rows(path, start, end):
+    """Parsira bajtove [start, end) u niz oblika (redovi, 5)."""
+    with open(path, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+    if not data.strip():
+        return np.empty((0, NUM_COLUMNS))
+    return np.loadtxt(io.BytesIO(data), dtype=np.float64, delimiter=",", ndmin=2)
+
+
+def compare_chunk(task):
+    """Poredi jedan blok redova; vraća maksimalne greške po koraku i tela koja odstupaju.
+
+    Blok ne mora biti poravnat sa koracima: korak reda je (globalni indeks reda) // N,
+    pa se korak koji prelazi granicu bloka kasnije spaja u verify_files.
+    """
+    path_a, a0, a1, path_b, b0, b1, row0, n_bodies, rtol, atol = task
+    a = read_rows(path_a, a0, a1)
+    b = read_rows(path_b, b0, b1)
+
+    if a.shape != b.shape:
+        return {"row0": row0, "error": f"shape mismatch {a.shape} vs {b.shape}"}
+    if not np.array_equal(a[:, :2], b[:, :2]):
+        return {"row0": row0, "error": "iteration/body_id columns differ"}
+
+    pa, pb = a[:, 2:], b[:, 2:]
+    abs_err = np.abs(pa - pb)
+    rel_err = abs_err / np.maximum(np.abs(pb), np.finfo(np.float64).tiny)
+    # NaN nikada nije "blizu", pa eksplodirala simulacija uvek odstupa
+    bad = ~np.isclose(pa, pb, rtol=rtol, atol=atol, equal_nan=False).all(axis=1)
+    nonfinite = ~(np.isfinite(pa).all(axis=1) & np.isfinite(pb).all(axis=1))
+
+    step = (row0 + np.arange(len(a))) // n_bodies
+    starts = np.flatnonzero(np.diff(step, prepend=-1))
+    bad_rows = np.flatnonzero(bad)
+    first_bad_step = int(step[bad_rows[0]]) if len(bad_rows) else None
+
+    return {
+        "row0": row0,
+        "steps": step[starts],
+        # np.maximum propagira NaN, pa se NaN greška vidi u izveštaju
+        "max_abs": np.maximum.reduceat(abs_err.max(axis=1), starts),
+        "max_rel": np.maximum.reduceat(rel_err.max(axis=1), starts),
+        "bad_per_step": np.add.reduceat(bad.astype(np.int64), starts),
+        "nonfinite_rows": int(nonfinite.sum()),
+        "bad_bodies": np.unique(a[bad_rows, 1].astype(np.int64)),
+        "first_bad_step": first_bad_step,
+        "first_bad": (a[bad_rows[step[bad_rows] == first_bad_step], 1].astype(np.int64)
+                      if first_bad_step is not None else None),
+    }
+
+
+def verify_files(path_a, path_b, rtol=1e-7, atol=1e-9, chunk_rows=DEFAULT_CHUNK_ROWS, workers=None):
+    """Poredi dva izlaza; vraća dict sa rezultatom provere.
+
+    Blokovi imaju najviše `chunk_rows` redova, nezavisno od N, pa memorija po
+    procesu ne raste sa brojem tela.
+
+    Ključevi: ok, steps, n_bodies, first_divergent_step, divergent_bodies (body_id
+    u prvom koraku koji odstupa), all_divergent_bodies, max_abs_per_step,
+    max_rel_per_step, divergent_per_step, nonfinite_rows, error (strukturna
+    greška ili None).
+    """
+    path_a, path_b = Path(path_a), Path(path_b)
+    n_bodies = bodies_per_step(path_a)
+    n_bodies_b = bodies_per_step(path_b)
+    chunk_rows = max(1, int(chunk_rows))
+
+    result = {
+        "ok": False, "steps": 0, "n_bodies": n_bodies,
+        "first_divergent_step": None, "divergent_bodies": [], "all_divergent_bodies": [],
+        "max_abs_per_step": np.empty(0), "max_rel_per_step": np.empty(0),
+        "divergent_per_step": np.empty(0, dtype=np.int64), "nonfinite_rows": 0, "error": None,
+    }
+
+    workers = workers or os.cpu_count() or 1
+    pool = mp.Pool(processes=workers) if workers > 1 else None
+    run = pool.imap if pool is not None else map
+
+    try:
+        # oba fajla se skeniraju paralelno, svaki u jednom prolazu
+        (off_a, lines_a, size_a), (off_b, lines_b, size_b) = list(
+            run(scan_offsets, [(str(path_a), chunk_rows), (str(path_b), chunk_rows)])
+        )
+        rows_a, rows_b = lines_a - 1, lines_b - 1
+        if n_bodies == 0 or n_bodies != n_bodies_b or rows_a != rows_b or rows_a % n_bodies != 0:
+            result["error"] = f"layout mismatch: N={n_bodies}/{n_bodies_b}, rows={rows_a}/{rows_b}"
+            return result
+
+        steps = rows_a // n_bodies
+        result["steps"] = steps
+        num_chunks = -(-rows_a // chunk_rows)
+        ends_a = off_a[1:num_chunks] + [size_a]
+        ends_b = off_b[1:num_chunks] + [size_b]
+        tasks = [
+            (str(path_a), off_a[k], ends_a[k], str(path_b), off_b[k], ends_b[k],
+             k * chunk_rows, n_bodies, rtol, atol)
+            for k in range(num_chunks)
+        ]
+
+        max_abs = np.zeros(steps)
+        max_rel = np.zeros(steps)
+        bad_per_step = np.zeros(steps, dtype=np.int64)
+        all_bad = set()
+        first_bad = []
+
+        for chunk in run(compare_chunk, tasks):
+            if "error" in chunk:
+                result["error"] = f"row {chunk['row0']}: {chunk['error']}"
+                return result
+            idx = chunk["steps"]
+            max_abs[idx] = np.maximum(max_abs[idx], chunk["max_abs"])
+            max_rel[idx] = np.maximum(max_rel[idx], chunk["max_rel"])
+            bad_per_step[idx] += chunk["bad_per_step"]
+            result["nonfinite_rows"] += chunk["nonfinite_rows"]
+            all_bad.update(chunk["bad_bodies"].tolist())
+            # blokovi stižu redom; prvi korak koji odstupa može se nastaviti u sledećem bloku
+            if chunk["first_bad_step"] is not None:
+                if result["first_divergent_step"] is None:
+                    result["first_divergent_step"] = chunk["first_bad_step"]
+                if chunk["first_bad_step"] == result["first_divergent_step"]:
+                    first_bad.extend(chunk["first_bad"].tolist())
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+
+    result["ok"] = result["first_divergent_step"] is None
+    result["divergent_bodies"] = sorted(first_bad)
+    result["all_divergent_bodies"] = sorted(all_bad)
+    result["max_abs_per_step"] = max_abs
+    result["max_rel_per_step"] = max_rel
+    result["divergent_per_step"] = bad_per_step
+    return result
+
+
+def print_report(name_a, name_b, result, max_listed=10):
+    print(f"  {name_a} vs {name_b}:", end=" ")
+    if result["error"]:
+        print(f"FAIL ({result['error']})")
+        return
+    max_abs = result["max_abs_per_step"]
+    worst = float(max_abs.max()) if len(max_abs) else 0.0
+    if result["nonfinite_rows"]:
+        print(f"[{result['nonfinite_rows']} rows with NaN/inf]", end=" ")
+    if result["ok"]:
+        print(f"OK (steps={result['steps']}, N={result['n_bodies']}, max |err|={worst:.3e})")
+        return
+    step = result["first_divergent_step"]
+    bodies = result["divergent_bodies"]
+    listed = ", ".join(str(b) for b in bodies[:max_listed]) + (" ..." if len(bodies) > max_listed else "")
+    print(f"FAIL (first divergent step={step}, max |err|={worst:.3e})")
+    print(f"    step {step}: {len(bodies)} bodies diverge [{listed}], max |err|={max_abs[step]:.3e}")
+    print(f"    divergent bodies over run: {len(result['all_divergent_bodies'])}/{result['n_bodies']}")
+
+
+def write_errors_csv(path, result):
+    """Maksimalne greške po koraku: step,max_abs_err,max_rel_err,divergent_bodies."""
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        f.write("step,max_abs_err,max_rel_err,divergent_bodies\n")
+        for s in range(result["steps"]):
+            f.write(f"{s},{result['max_abs_per_step'][s]},{result['max_rel_per_step'][s]},{result['divergent_per_step'][s]}\n")
+
+
+def verify_pairs(pairs, rtol=1e-7, atol=1e-9, chunk_rows=DEFAULT_CHUNK_ROWS, workers=None):
+    """Proverava listu parova (ime_a, putanja_a, ime_b, putanja_b).
+
+    Vraća False ako se bilo koji par razlikuje, "skipped" ako neki par nije
+    proveren (nema izlaza), inače True.
+    """
+    status = True
+    for name_a, path_a, name_b, path_b in pairs:
+        if path_a is None or path_b is None:
+            reason = "trajectory output disabled"
+        elif not Path(path_a).exists() or not Path(path_b).exists():
+            reason = "missing output"
+        else:
+            reason = None
+        if reason:
+            print(f"  {name_a} vs {name_b}: skipped ({reason})")
+            if status is True:
+                status = "skipped"
+            continue
+        result = verify_files(path_a, path_b, rtol, atol, chunk_rows, workers)
+        print_report(name_a, name_b, result)
+        if not result["ok"]:
+            status = False
+    return status
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Provera saglasnosti izlaza simulacija")
+    parser.add_argument("files", nargs="*", type=Path, help="Dva CSV fajla; bez argumenata koriste se izlazi iz config.json")
+    parser.add_argument("--rtol", type=float, default=1e-7, help="Relativna tolerancija")
+    parser.add_argument("--atol", type=float, default=1e-9, help="Apsolutna tolerancija")
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS, help="Broj redova po bloku")
+    parser.add_argument("--workers", type=int, default=None, help="Broj procesa (podrazumevano: broj jezgara)")
+    parser.add_argument("--cross", action="store_true", help="Porediti i Python sa Rust izlazima")
+    parser.add_argument("--errors-csv", type=Path, default=None, help="Upisati greške po koraku (samo za jedan par)")
+    args = parser.parse_args()
+
+    if args.files and len(args.files) != 2:
+        parser.error("expected exactly two files")
+
+    if args.files:
+        a, b = args.files
+        result = verify_files(a, b, args.rtol, args.atol, args.chunk_rows, args.workers)
+        print_report(a.name, b.name, result)
+        if args.errors_csv and not result["error"]:
+            write_errors_csv(args.errors_csv, result)
+        sys.exit(0 if result["ok"] else 1)
+
+    out = default_outputs(load_config())
+    pairs = [
+        ("seq_python", out["seq_python"], "par_python", out["par_python"]),
+        ("seq_rust", out["seq_rust"], "par_rust", out["par_rust"]),
+    ]
+    if args.cross:
+        pairs.append(("seq_python", out["seq_python"], "seq_rust", out["seq_rust"]))
+    status = verify_pairs(pairs, args.rtol, args.atol, args.chunk_rows, args.workers)
+    sys.exit(1 if status is False else 0)
+
+
+if __name__ == "__main__":
+    main()